@@ -11,6 +11,10 @@ class PyfronBasicBackend(PyfronBackend):
         app.add_url_rule('/<pageId>', view_func=self.getRequest, methods=["GET"])
         app.add_url_rule('/onEvent', view_func=self.postRequest, methods=["POST"])
         app.add_url_rule('/<pageId>/onEvent', view_func=self.postRequest, methods=["POST"])
+        app.add_url_rule('/onEvents', view_func=self.postEventsRequest, methods=["POST"])
+        app.add_url_rule('/<pageId>/onEvents', view_func=self.postEventsRequest, methods=["POST"])
+        app.add_url_rule('/onNavigate', view_func=self.navigateRequest, methods=["GET"])
+        app.add_url_rule('/<pageId>/onNavigate', view_func=self.navigateRequest, methods=["GET"])
         # files can only be stored in the 'static' folder in the main project route
         app.add_url_rule('/static/<filename>', view_func=self.sendFile)
         # this will block the thread and start listening for new requests
@@ -23,8 +27,8 @@ class PyfronBasicBackend(PyfronBackend):
 
     def getRequestData(self): 
         path: str = request.path
-        if path.endswith("onEvent"): 
-            path = "/" + path.split('/')[0]
+        if path.endswith(("onEvent", "onEvents", "onNavigate")): 
+            path = path.rsplit('/', 1)[0] or "/"
         try: 
             json: dict = request.get_json(force=False) or {}
         except: 
@@ -40,5 +44,11 @@ class PyfronBasicBackend(PyfronBackend):
     def postRequest(self, *args, **kwargs): 
         return self.pyfron.onEvent(*self.getRequestData())
 
+    def postEventsRequest(self, *args, **kwargs): 
+        return self.pyfron.onEvents(*self.getRequestData())
+
+    def navigateRequest(self, *args, **kwargs): 
+        return self.pyfron.onNavigate(*self.getRequestData())
+
 
 
@@ -3,6 +3,7 @@ import asyncio
 import websockets 
 import os 
 import json 
+from typing import Union
 from urllib.parse import unquote, urlparse
 
 class WebSocketBackend(PyfronBackend): 
@@ -15,8 +16,11 @@ class WebSocketBackend(PyfronBackend):
             print(f"started websocket server at: {port}") 
             await asyncio.Future()
     
+    async def getRawWebsocketMessage(self, websocket) -> Union[str, bytes]: 
+        return await websocket.recv()
+
     async def getWebsocketMessage(self, websocket) -> dict: 
-        message = await websocket.recv()
+        message = await self.getRawWebsocketMessage(websocket)
         return json.loads(message) 
 
     async def handler(self, websocket): 
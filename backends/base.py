@@ -22,3 +22,6 @@ class PyfronBackend(ABC):
     def handleEvent(self, path: str, event: dict, headers: Optional[dict]) -> tuple[int, str]: 
         return self.pyfron.onEvent(path, event)
 
+    def handleEvents(self, path: str, batch: dict, headers: Optional[dict]) -> tuple[int, str]: 
+        return self.pyfron.onEvents(path, batch)
+
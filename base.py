@@ -1,9 +1,37 @@
 from copy import deepcopy
+import asyncio
+import json
+import logging
 from .htmlelement import HTMLElement
-from typing import Optional
+from typing import MutableMapping, Optional, Union
 from .exceptions import PageNotFound
 from .backends import PyfronBackend
-import json
+
+logger = logging.getLogger(__name__)
+
+
+class PageWebsocket: 
+    """
+    Websocket given to the page handlers (onWebSocketConnection). 
+    Pyfron reads all the messages of the client to follow its navigation, the messages that are not 
+    a locationUpdate are forwarded here (as they were received), so the handlers can still use recv(). 
+    Everything else (send, close..) goes to the real websocket. 
+    """
+    def __init__(self, websocket): 
+        self.websocket = websocket
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def recv(self) -> Union[str, bytes]: 
+        return await self.messages.get()
+
+    def __aiter__(self): 
+        return self
+
+    async def __anext__(self) -> Union[str, bytes]: 
+        return await self.recv()
+
+    def __getattr__(self, name: str): 
+        return getattr(self.websocket, name)
 
 
 class Pyfron:
@@ -18,10 +46,28 @@ class Pyfron:
     """
     def __init__(self, pages: list[tuple[str, callable]], backend: PyfronBackend):
         self.pages = {}
+        # path -> html of a fresh copy of the page, used to answer get requests without rendering
+        self.prerendered: MutableMapping[str, str] = {}
         for p in pages:
             self.addPage(p) 
         self.backend = backend(self)
 
+    @classmethod
+    def fromSnapshot(cls, filename: str, backend: PyfronBackend, pages: Optional[list[HTMLElement]] = None) -> "Pyfron": 
+        """
+        Create the application from a snapshot built with pyfron.snapshot, 
+        the pages are loaded lazily from the snapshot, the given pages are added (or replaced) on top of them. 
+        """
+        from .snapshot import loadSnapshot
+
+        snapshot = loadSnapshot(filename)
+        app = cls([], backend)
+        app.pages = snapshot.pages
+        app.prerendered = snapshot.renders
+        for p in pages or []: 
+            app.addPage(p)
+        return app
+
     def start(self, *args, **kwargs): 
         """Start the backend service"""
         self.backend.start(*args, **kwargs)
@@ -34,14 +80,17 @@ class Pyfron:
         """
         Safely gets a fresh copy from the pages dict 
         """
-        # normalize the path
-        if not path.startswith("/"):
-            path = "/" + path
-
+        path = self._normalizePath(path)
         if not path in self.pages:
             return None
         return deepcopy(self.pages.get(path))
 
+    @staticmethod
+    def _normalizePath(path: str) -> str: 
+        if not path.startswith("/"):
+            path = "/" + path
+        return path
+
     def _renderPage(
         self, 
         path: Optional[str] = None, 
@@ -58,7 +107,7 @@ class Pyfron:
         if not page:
             page = Div(class_name="not_found_page", text="not found")
         if v2: 
-            res = page.renderV2(**kwargs) 
+            res = page.renderV2JSON(**kwargs) 
         else: 
             res = page.render(**kwargs)
         if final: 
@@ -70,7 +119,14 @@ class Pyfron:
         """
         Adds a page to the application
         """
+        # the copies of the page (one per request) inherit its ids and its cached state, 
+        # so they only need to serialize the elements that change
+        page.updateElemId()
+        page.dumpToJSON()
         self.pages[page.path] = page
+        if page.path in self.prerendered: 
+            # the prerendered html is from the replaced page
+            del self.prerendered[page.path]
 
     def canHandleEvent(self, path: str, event: dict) -> bool: 
         """
@@ -87,6 +143,9 @@ class Pyfron:
         Handle a pyfron event, an event can be: get to one of our pages, a user based event (click, submit) 
         any other event should be handled in the backend level.
         """
+        if not event and (html := self.prerendered.get(self._normalizePath(path))): 
+            return html
+
         page = self._getPage(path)
         if not page:
             return "", 400
@@ -97,42 +156,137 @@ class Pyfron:
             return self._renderPage(page=page)
 
         page.prepare(remoteState=event.pop("state", {}))
+        target = self._resolveTarget(page, event)
+        if not target: 
+            return "WRONG_TARGET", 400
         
         # start processing the event, we have all set
-        eventType: str = event.pop("eventType")
+        page = self._handleEvent(page, event, target)
+        if not page: 
+            return "WRONG_EVENT", 500
+        return self._renderPage(page=page, v2=True)
+
+    def onEvents(self, path: str, batch: dict):
+        """
+        Handle a batch of user based events (click, submit) that happened in the client in a short window of time, 
+        the events are applied in order to the same page, and the changes of all of them are returned at once. 
+        batch: {"state": the page state before the events, "events": [event, ...]}
+        """
+        page = self._getPage(path)
+        if not page or not batch: 
+            return "", 400
+
+        page.prepare(remoteState=batch.get("state", {}))
+        events: list[dict] = batch.get("events", [])
+        # the targets are elemIds of the page that the client sent, an event can add or remove elements, 
+        # so we find all the targets before handling any event 
+        targets = [self._resolveTarget(page, event) for event in events]
+        if not all(targets): 
+            return "WRONG_TARGET", 400
+
+        for event, target in zip(events, targets): 
+            page = self._handleEvent(page, event, target)
+            if not page: 
+                return "WRONG_EVENT", 500
+        return self._renderPage(page=page, v2=True)
+
+    def onNavigate(self, path: str, event: Optional[dict] = None): 
+        """
+        Handle the navigation of a client to one of our pages from another pyfron page, 
+        only the body and the state of the page are sent, the client keeps the js runtime and the websocket 
+        """
+        page = self._getPage(path)
+        if not page or not hasattr(page, "renderNavigationJSON"): 
+            return "", 400
+        page.prepare()
+        result = page.renderNavigationJSON()
+        self._finalize(page)
+        return result
+
+    @staticmethod
+    def _resolveTarget(page: HTMLElement, event: dict) -> Optional[HTMLElement]: 
+        """
+        Find the target element of an event in the given (already prepared) page, 
+        returns None if the event has no valid target. 
+        """
+        try: 
+            return page.findChildrenByElemId(event["target"])
+        except (KeyError, IndexError, ValueError, TypeError, AttributeError): 
+            return None
+
+    def _handleEvent(self, page: HTMLElement, event: dict, target: HTMLElement) -> Optional[HTMLElement]: 
+        """
+        Apply a user based event to the given (already prepared) page, 
+        returns the resulting page, or None if the event is not supported. 
+        """
+        eventType: str = event.pop("eventType", "")
         # other events are not supported yet
-        if eventType in ("submit", "click"):
+        if eventType in ("submit", "click", "scroll"):
             eventHandlerName = f"on{eventType}Request"
             if handler := getattr(page, eventHandlerName, None):
-                page = handler(event) or page
-                return self._renderPage(page=page, v2=True)
-        return "WRONG_EVENT", 500
+                return handler(event, target) or page
+        return None
     
     async def handleWebsocketConnection(self, websocket): 
         """
         Handles a websocket connection to our application
         """
-        event: dict = await self.backend.getWebsocketMessage(websocket) 
-        if event["type"] == "locationUpdate":
-            pageId = event["pageId"]
+        # the client sends a locationUpdate each time it navigates to another page (without reloading) 
+        # so we stop the handler of the previous page and start the handler of the new one 
+        pageHandler: Optional[asyncio.Task] = None
+        pageWebsocket: Optional[PageWebsocket] = None
+        try: 
+            while True: 
+                message: Union[str, bytes] = await self.backend.getRawWebsocketMessage(websocket) 
+                if pageId := self._getLocationUpdate(message): 
+                    if pageHandler: 
+                        pageHandler.cancel()
+                    pageWebsocket = PageWebsocket(websocket)
+                    pageHandler = asyncio.ensure_future(self._handlePageWebsocket(pageWebsocket, pageId))
+                    pageHandler.add_done_callback(self._logPageHandlerError)
+                elif pageWebsocket: 
+                    # the page handler can't recv() from the websocket, we are already doing it
+                    pageWebsocket.messages.put_nowait(message)
+        finally: 
+            if pageHandler: 
+                pageHandler.cancel()
+
+    @staticmethod
+    def _getLocationUpdate(message: Union[str, bytes]) -> Optional[str]: 
+        """
+        Returns the pageId of a locationUpdate message, or None for the other messages (that can be in any format) 
+        """
+        try: 
+            event = json.loads(message)
+        except (TypeError, ValueError): 
+            return None
+        if isinstance(event, dict) and event.get("type") == "locationUpdate" and isinstance(event.get("pageId"), str): 
+            return event["pageId"]
+        return None
+
+    @staticmethod
+    def _logPageHandlerError(pageHandler: asyncio.Task): 
+        # the handler task is never awaited, so its errors would be lost
+        if not pageHandler.cancelled() and (error := pageHandler.exception()): 
+            logger.error("error in the websocket handler of the page", exc_info=error)
 
-            page = self._getPage(pageId) 
-            # we create a copy of the page for each handler. 
-            # is risky if we have a lot of clients, because it will consume quite a lot of memory, to have all this pages
-            # in the ram at the same time. 
-            # try to remove this (self._finalize) page when possible 
-            page: Optional[HTMLElement] = self._getPage(pageId) 
+    async def _handlePageWebsocket(self, websocket, pageId: str): 
+        # we create a copy of the page for each handler. 
+        # is risky if we have a lot of clients, because it will consume quite a lot of memory, to have all this pages
+        # in the ram at the same time. 
+        # try to remove this (self._finalize) page when possible 
+        page: Optional[HTMLElement] = self._getPage(pageId) 
 
-            if page and hasattr(page, "onWebSocketConnection"): 
-                page.prepare()
-                # give the control to the user defined handler 
-                await page.onWebSocketConnection(websocket, page, self) 
-                self._finalize(page) 
+        if page and hasattr(page, "onWebSocketConnection"): 
+            page.prepare()
+            # give the control to the user defined handler 
+            await page.onWebSocketConnection(websocket, page, self) 
+            self._finalize(page) 
 
     async def broadCastPageChanges(self, websocket, page): 
         """
         Method used to broadcast the changes of a page to a the client, via the given websocket 
         """
         content = self._renderPage(page=page, v2=True, final=False) 
-        await websocket.send(json.dumps(content))  
+        await websocket.send(content)  
     
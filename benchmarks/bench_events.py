@@ -0,0 +1,66 @@
+"""
+Benchmark a burst of clicks, sending one request per event (onEvent) vs sending them 
+in one batch (onEvents). Measures the server CPU time and the bytes sent by the client. 
+
+run it from the folder that contains the pyfron package: 
+    python -m pyfron.benchmarks.bench_events
+"""
+import json
+import time
+
+from pyfron.base import Pyfron
+from pyfron.benchmarks.helpers import DummyBackend
+from pyfron.htmlelement import Button, Div, P, Page
+
+
+def increment(document): 
+    counter = document.findElementsByClassName("counter")[0]
+    counter.text = str(int(counter.text) + 1)
+
+
+def buildApp(rows: int) -> Pyfron: 
+    # the handler is restored from the page state by its module name, so it can't be defined in __main__
+    from pyfron.benchmarks.bench_events import increment
+
+    page = Page(
+        path="/bench", 
+        childrens=[
+            Button(class_name="increment", text="+1", onClick=increment), 
+            P(class_name="counter", text="0"), 
+            Div(class_name="rows", childrens=[P(class_name=f"row_{i}", text=f"row {i}") for i in range(rows)]), 
+        ],
+    )
+    return Pyfron([page], DummyBackend)
+
+
+def benchSingle(app: Pyfron, events: int) -> tuple[float, int, int]: 
+    state = json.loads(app._getPage("/bench").dumpToJSON())
+    sent = 0
+    start = time.perf_counter()
+    for _ in range(events): 
+        request = json.dumps({"state": state, "eventType": "click", "target": "0-0"})
+        sent += len(request)
+        state = json.loads(app.onEvent("/bench", json.loads(request)))["state"]
+    return time.perf_counter() - start, events, sent
+
+
+def benchBatch(app: Pyfron, events: int) -> tuple[float, int, int]: 
+    state = json.loads(app._getPage("/bench").dumpToJSON())
+    start = time.perf_counter()
+    request = json.dumps({"state": state, "events": [{"eventType": "click", "target": "0-0"}] * events})
+    json.loads(app.onEvents("/bench", json.loads(request)))
+    return time.perf_counter() - start, 1, len(request)
+
+
+def main(): 
+    print(f"{'rows':>6} {'events':>6} {'mode':>7} {'ms':>10} {'requests':>8} {'KiB sent':>10}")
+    for rows in (100, 1_000): 
+        app = buildApp(rows)
+        for events in (5, 20): 
+            for mode, bench in (("single", benchSingle), ("batch", benchBatch)): 
+                elapsed, requests, sent = bench(app, events)
+                print(f"{rows:>6} {events:>6} {mode:>7} {elapsed * 1000:>10.1f} {requests:>8} {sent / 1024:>10.1f}")
+
+
+if __name__ == "__main__": 
+    main()
@@ -0,0 +1,39 @@
+"""
+Benchmark the copy of a page that the application makes for each request (Pyfron._getPage), 
+for a page that was just added, and for a page with dirty markers (changed after it was added). 
+
+run it from the folder that contains the pyfron package: 
+    python -m pyfron.benchmarks.bench_get_page
+"""
+import timeit
+
+from pyfron.base import Pyfron
+from pyfron.benchmarks.helpers import DummyBackend
+from pyfron.htmlelement import Div, P, Page
+
+
+def buildPage(rows: int) -> Page: 
+    return Page(
+        path="/bench", 
+        childrens=[Div(class_name="rows", childrens=[P(class_name=f"row_{i}", text=f"row {i}") for i in range(rows)])],
+    )
+
+
+def bench(rows: int, dirty: bool, number: int = 10) -> float: 
+    app = Pyfron([buildPage(rows)], DummyBackend)
+    if dirty: 
+        rowsElement = app.pages["/bench"].childrens[0]
+        for row in rowsElement.childrens[::100]: 
+            row.text = "changed"
+    return timeit.timeit(lambda: app._getPage("/bench"), number=number) / number
+
+
+def main(): 
+    print(f"{'rows':>8} {'dirty':>6} {'ms/copy':>10}")
+    for rows in (2_000, 20_000): 
+        for dirty in (False, True): 
+            print(f"{rows:>8} {str(dirty):>6} {bench(rows, dirty) * 1000:>10.2f}")
+
+
+if __name__ == "__main__": 
+    main()
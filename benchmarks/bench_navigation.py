@@ -0,0 +1,39 @@
+"""
+Benchmark the navigation between two pages, a full page load (GET) vs a client side navigation (onNavigate), 
+measures the server time and the bytes sent to the client. 
+
+run it from the folder that contains the pyfron package: 
+    python -m pyfron.benchmarks.bench_navigation
+"""
+import timeit
+
+from pyfron.base import Pyfron
+from pyfron.benchmarks.helpers import DummyBackend
+from pyfron.htmlelement import Div, Link, P, Page
+
+
+def buildApp(rows: int) -> Pyfron: 
+    pages = [
+        Page(
+            path=f"/page_{i}", 
+            childrens=[
+                Div(class_name="nav", childrens=[Link(class_name="link", href=f"/page_{1 - i}", text="other page")]), 
+                Div(class_name="rows", childrens=[P(class_name=f"row_{j}", text=f"row {j}") for j in range(rows)]), 
+            ],
+        )
+        for i in range(2)
+    ]
+    return Pyfron(pages, DummyBackend)
+
+
+def main(number: int = 20): 
+    print(f"{'rows':>6} {'mode':>9} {'ms':>8} {'KiB sent':>10}")
+    for rows in (10, 100, 1_000): 
+        app = buildApp(rows)
+        for mode, navigate in (("reload", lambda: app.onEvent("/page_1", {})), ("navigate", lambda: app.onNavigate("/page_1"))): 
+            elapsed = timeit.timeit(navigate, number=number) / number
+            print(f"{rows:>6} {mode:>9} {elapsed * 1000:>8.2f} {len(navigate().encode()) / 1024:>10.1f}")
+
+
+if __name__ == "__main__": 
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark the full render of a page (what a GET request does) with and without 
+caching the render of the static parts of the page (nav bar, footer). 
+
+run it from the folder that contains the pyfron package: 
+    python -m pyfron.benchmarks.bench_render_cache
+"""
+import timeit
+
+from pyfron.base import Pyfron
+from pyfron.benchmarks.helpers import DummyBackend
+from pyfron.cache import RENDER_CACHE
+from pyfron.htmlelement import Div, Link, P, Page
+
+
+def buildPage(cacheRender: bool, links: int = 200, rows: int = 50) -> Page: 
+    return Page(
+        path="/bench", 
+        childrens=[
+            Div(
+                class_name="nav", 
+                cacheRender=cacheRender, 
+                childrens=[Link(class_name=f"link_{i}", href=f"/page_{i}", text=f"page {i}") for i in range(links)], 
+            ), 
+            Div(
+                class_name="content", 
+                childrens=[P(class_name=f"row_{i}", text=f"row {i}") for i in range(rows)], 
+            ), 
+            Div(
+                class_name="footer", 
+                cacheRender=cacheRender, 
+                childrens=[P(class_name=f"footer_{i}", text=f"footer {i}") for i in range(links)], 
+            ), 
+        ],
+    )
+
+
+def bench(cacheRender: bool, number: int = 50) -> tuple[float, float]: 
+    """returns the time of a full request (copy the page + render) and the time of the html render only"""
+    app = Pyfron([buildPage(cacheRender)], DummyBackend)
+    RENDER_CACHE.clear()
+    request = timeit.timeit(lambda: app._renderPage(path="/bench"), number=number) / number
+    page = app._getPage("/bench")
+    page.updateElemId()
+    html = timeit.timeit(lambda: page.renderContent(), number=number) / number
+    return request, html
+
+
+def main(): 
+    print(f"{'cacheRender':>12} {'ms/request':>12} {'ms/html':>10} {'hitRate':>8}")
+    for cacheRender in (False, True): 
+        request, html = bench(cacheRender)
+        print(
+            f"{str(cacheRender):>12} {request * 1000:>12.2f} {html * 1000:>10.2f} "
+            f"{RENDER_CACHE.stats()['hitRate']:>8.2f}"
+        )
+
+
+if __name__ == "__main__": 
+    main()
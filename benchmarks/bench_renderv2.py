@@ -0,0 +1,48 @@
+"""
+Benchmark the cost of finding and rendering the changes of a page (renderV2 / websocket pushes), 
+for different page sizes and number of changed elements. 
+
+run it from the folder that contains the pyfron package: 
+    python -m pyfron.benchmarks.bench_renderv2
+"""
+import timeit
+
+from pyfron.htmlelement import Div, P, Page
+
+
+def buildPage(rows: int) -> Page: 
+    return Page(
+        path="/bench", 
+        childrens=[
+            Div(
+                class_name=f"row_{i}", 
+                childrens=[P(class_name=f"text_{i}", text=f"row {i}")], 
+            )
+            for i in range(rows)
+        ],
+    )
+
+
+def benchChanges(rows: int, changed: int, number: int = 20) -> float: 
+    page = buildPage(rows)
+    page.updateElemId()
+    step = max(rows // changed, 1)
+    targets = [page.childrens[i].childrens[0] for i in range(0, rows, step)][:changed]
+
+    def push(): 
+        for t in targets: 
+            t.text = "updated"
+        page.getChanges()
+
+    return timeit.timeit(push, number=number) / number
+
+
+def main(): 
+    print(f"{'rows':>8} {'changed':>8} {'ms/push':>10}")
+    for rows in (100, 1_000, 10_000): 
+        for changed in (1, 10, 100): 
+            print(f"{rows:>8} {changed:>8} {benchChanges(rows, changed) * 1000:>10.3f}")
+
+
+if __name__ == "__main__": 
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark the cold start of an application (start a process, load the pages and answer the first GET request), 
+building the pages from the user modules vs loading them from a snapshot. 
+
+run it from the folder that contains the pyfron package: 
+    python -m pyfron.benchmarks.bench_snapshot
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from pyfron.base import Pyfron
+from pyfron.benchmarks.helpers import DummyBackend
+from pyfron.htmlelement import Div, P, Page
+
+PAGES = 20
+ROWS = 2_000
+
+
+def buildApp() -> Pyfron: 
+    pages = [
+        Page(
+            path=f"/page_{i}", 
+            childrens=[
+                Div(class_name=f"row_{j}", childrens=[P(class_name=f"text_{j}", text=f"row {j}")]) 
+                for j in range(ROWS)
+            ],
+        )
+        for i in range(PAGES)
+    ]
+    return Pyfron(pages, DummyBackend)
+
+
+FROM_MODULES = """
+from pyfron.benchmarks.bench_snapshot import buildApp
+buildApp().onEvent("/page_0", {})
+"""
+
+FROM_SNAPSHOT = """
+from pyfron.base import Pyfron
+from pyfron.benchmarks.helpers import DummyBackend
+Pyfron.fromSnapshot({filename!r}, DummyBackend).onEvent("/page_0", {{}})
+"""
+
+
+def coldStart(code: str, number: int = 3) -> float: 
+    best = float("inf")
+    for _ in range(number): 
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=os.getcwd())
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(): 
+    from pyfron.snapshot import buildSnapshot
+
+    with tempfile.TemporaryDirectory() as folder: 
+        filename = os.path.join(folder, "app.snapshot")
+        start = time.perf_counter()
+        buildSnapshot(buildApp(), filename)
+        print(f"snapshot built in {time.perf_counter() - start:.2f}s ({os.path.getsize(filename) / 2**20:.1f} MiB)")
+
+        print(f"{PAGES} pages of {ROWS * 2} elements")
+        print(f"{'':>10} {'cold start ms':>14}")
+        print(f"{'modules':>10} {coldStart(FROM_MODULES) * 1000:>14.1f}")
+        print(f"{'snapshot':>10} {coldStart(FROM_SNAPSHOT.format(filename=filename)) * 1000:>14.1f}")
+
+
+if __name__ == "__main__": 
+    main()
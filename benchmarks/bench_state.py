@@ -0,0 +1,58 @@
+"""
+Benchmark the serialization of the page state after a small change in a large page, 
+serializing all the tree (dumpToDict + json.dumps) vs the incremental dumpToJSON. 
+And a GET request of the page, when the copies of the page inherit the cached state of the template or not. 
+
+run it from the folder that contains the pyfron package: 
+    python -m pyfron.benchmarks.bench_state
+"""
+import json
+import timeit
+
+from pyfron.base import Pyfron
+from pyfron.benchmarks.bench_renderv2 import buildPage
+from pyfron.benchmarks.helpers import DummyBackend
+
+
+def bench(rows: int, changed: int, number: int = 20) -> tuple[float, float]: 
+    page = buildPage(rows)
+    page.updateElemId()
+    targets = [page.childrens[i].childrens[0] for i in range(0, rows, max(rows // changed, 1))][:changed]
+    # warm up the cached JSON
+    page.dumpToJSON()
+
+    def change(): 
+        for t in targets: 
+            t.text = "updated"
+
+    full = timeit.timeit(lambda: (change(), json.dumps(page.dumpToDict())), number=number) / number
+    incremental = timeit.timeit(lambda: (change(), page.dumpToJSON()), number=number) / number
+    return full, incremental
+
+
+def benchGet(rows: int, number: int = 20) -> tuple[float, float]: 
+    """returns the time of a GET request, with a template page that is not warmed, and with a warmed one"""
+    app = Pyfron([], DummyBackend)
+    # added without addPage, so the cached state is not built
+    app.pages["/cold"] = buildPage(rows)
+    app.addPage(buildPage(rows))
+    cold = timeit.timeit(lambda: app.onEvent("/cold", {}), number=number) / number
+    warm = timeit.timeit(lambda: app.onEvent("/bench", {}), number=number) / number
+    return cold, warm
+
+
+def main(): 
+    print(f"{'rows':>8} {'changed':>8} {'full ms':>10} {'incr. ms':>10}")
+    for rows in (1_000, 10_000): 
+        for changed in (1, 10, 100): 
+            full, incremental = bench(rows, changed)
+            print(f"{rows:>8} {changed:>8} {full * 1000:>10.3f} {incremental * 1000:>10.3f}")
+
+    print(f"{'rows':>8} {'GET cold ms':>12} {'GET warm ms':>12}")
+    for rows in (1_000, 10_000): 
+        cold, warm = benchGet(rows)
+        print(f"{rows:>8} {cold * 1000:>12.3f} {warm * 1000:>12.3f}")
+
+
+if __name__ == "__main__": 
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark the memory and payload of a page with a very large list of rows, 
+rendering all the rows in a Div vs rendering a window of them with a VirtualList. 
+
+run it from the folder that contains the pyfron package: 
+    python -m pyfron.benchmarks.bench_virtual_list
+"""
+import json
+import time
+import tracemalloc
+from copy import deepcopy
+
+from pyfron.htmlelement import Div, HTMLElement, P, Page, VirtualList
+
+ROWS = 100_000
+
+
+def rowsDataSource(offset: int, count: int) -> list[HTMLElement]: 
+    return [P(class_name=f"row_{i}", text=f"row {i}") for i in range(offset, min(offset + count, ROWS))]
+
+
+def buildDivPage() -> Page: 
+    return Page(path="/bench", childrens=[Div(class_name="rows", childrens=rowsDataSource(0, ROWS))])
+
+
+def buildVirtualListPage() -> Page: 
+    return Page(path="/bench", childrens=[VirtualList(class_name="rows", dataSource=rowsDataSource)])
+
+
+def bench(name: str, build): 
+    tracemalloc.start()
+    start = time.perf_counter()
+    page = build()
+    # what the application does for each request
+    page = deepcopy(page)
+    page.prepare()
+    html = page.render()
+    state = json.dumps(page.dumpToDict())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:>12} {elapsed * 1000:>10.1f} {peak / 2**20:>10.1f} "
+        f"{len(html) / 1024:>10.1f} {len(state) / 1024:>10.1f}"
+    )
+
+
+def main(): 
+    print(f"{ROWS} rows")
+    print(f"{'':>12} {'ms':>10} {'peak MiB':>10} {'html KiB':>10} {'state KiB':>10}")
+    bench("Div", buildDivPage)
+    bench("VirtualList", buildVirtualListPage)
+
+
+if __name__ == "__main__": 
+    main()
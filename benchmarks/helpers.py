@@ -0,0 +1,12 @@
+"""
+Shared helpers of the benchmarks (and the tests)
+"""
+from pyfron.backends import PyfronBackend
+
+
+class DummyBackend(PyfronBackend): 
+    """
+    Backend that doesn't start any server, the benchmarks call the pyfron application directly
+    """
+    def start(self, *args, **kwargs): 
+        ...
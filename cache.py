@@ -0,0 +1,73 @@
+"""
+Render cache, used to share the rendered HTML of the elements that don't change (nav bars, footers, forms..) 
+between requests, pages copies and websocket clients. 
+"""
+from collections import OrderedDict
+from typing import Callable, Hashable
+import os
+import threading
+
+
+class RenderCache: 
+    """
+    LRU cache of rendered HTML fragments, bounded by the total size of the fragments. 
+    The keys contain the version of the element, when an element changes it gets a new version, 
+    so the old fragments are never used again, and are evicted when the cache is full. 
+    """
+    def __init__(self, maxBytes: int): 
+        self.maxBytes = maxBytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._fragments: OrderedDict[Hashable, str] = OrderedDict()
+        # the cache is shared between the threads of the backend (e.g flask)
+        self._lock = threading.Lock()
+
+    def getOrRender(self, key: Hashable, render: Callable[[], str]) -> str: 
+        """
+        Return the cached fragment for the given key, or render and cache it. 
+        """
+        with self._lock: 
+            fragment = self._fragments.get(key)
+            if fragment is not None: 
+                self.hits += 1
+                self._fragments.move_to_end(key)
+                return fragment
+            self.misses += 1
+
+        # we don't hold the lock while rendering, the render of the childrens uses the cache too
+        fragment = render()
+        if len(fragment) <= self.maxBytes: 
+            with self._lock: 
+                if key not in self._fragments: 
+                    self._fragments[key] = fragment
+                    self.size += len(fragment)
+                while self.size > self.maxBytes: 
+                    _, evicted = self._fragments.popitem(last=False)
+                    self.size -= len(evicted)
+        return fragment
+
+    def clear(self): 
+        with self._lock: 
+            self._fragments.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict: 
+        with self._lock: 
+            return self._stats()
+
+    def _stats(self) -> dict: 
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits, 
+            "misses": self.misses, 
+            "hitRate": self.hits / total if total else 0.0, 
+            "entries": len(self._fragments), 
+            "size": self.size, 
+            "maxBytes": self.maxBytes, 
+        }
+
+
+RENDER_CACHE = RenderCache(maxBytes=int(os.getenv("PYFRON_RENDER_CACHE_BYTES", 32 * 2**20)))
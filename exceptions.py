@@ -4,3 +4,7 @@ class ElementNotFound(Exception):
 
 class PageNotFound(ElementNotFound):
     ...
+
+
+class InvalidSnapshot(Exception):
+    ...
@@ -1,13 +1,160 @@
 import copy
+import json
+import types
 from typing import Optional, Union
 
+from pyfron.cache import RENDER_CACHE
 from pyfron.constants import JS_SUPPORT_SCRIPT
 from pyfron.exceptions import ElementNotFound
 from importlib import import_module
 from collections import deque
+from itertools import count
+
+# every change of an element gets a new version, unique between all the elements (and their copies)
+_VERSIONS = count()
+# values that deepcopy doesn't copy, the copies of the elements share them
+_ATOMIC_TYPES = (str, int, float, bool, bytes, type(None), type, types.FunctionType, types.BuiltinFunctionType)
+
+
+class _TrackedList(list): 
+    """
+    List of childrens of an element, the in place changes (e.g append) mark the element as changed
+    """
+    def __init__(self, owner: "HTMLElement", items=()): 
+        super().__init__(items)
+        self._owner = owner
+
+    def __reduce_ex__(self, protocol): 
+        # pickles are rebuilt without marking the owner as changed
+        return (self.__class__, (self._owner, list(self)))
+
+    def __deepcopy__(self, memo: dict) -> "_TrackedList": 
+        copied = self.__class__(copy.deepcopy(self._owner, memo))
+        memo[id(self)] = copied
+        # list.extend, so the copy is not marked as changed
+        list.extend(copied, (copy.deepcopy(item, memo) for item in self))
+        return copied
+
+    def _changed(self, items=()): 
+        for item in items: 
+            if isinstance(item, HTMLElement): 
+                item._parent = self._owner
+        self._owner._markChanged()
+
+    def append(self, item): 
+        super().append(item)
+        self._changed([item])
+
+    def extend(self, items): 
+        items = list(items)
+        super().extend(items)
+        self._changed(items)
+
+    def __iadd__(self, items): 
+        self.extend(items)
+        return self
+
+    def insert(self, index, item): 
+        super().insert(index, item)
+        self._changed([item])
+
+    def __setitem__(self, index, item): 
+        super().__setitem__(index, item)
+        self._changed(item if isinstance(index, slice) else [item])
+
+    def __delitem__(self, index): 
+        super().__delitem__(index)
+        self._changed()
+
+    def remove(self, item): 
+        super().remove(item)
+        self._changed()
+
+    def pop(self, *args): 
+        item = super().pop(*args)
+        self._changed()
+        return item
+
+    def clear(self): 
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs): 
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self): 
+        super().reverse()
+        self._changed()
+
+
+class _TrackedDict(dict): 
+    """
+    Attributes of an element, the in place changes mark the element as changed
+    """
+    def __init__(self, owner: "HTMLElement", items=()): 
+        super().__init__(items)
+        self._owner = owner
+
+    def __reduce_ex__(self, protocol): 
+        # pickles are rebuilt without marking the owner as changed
+        return (self.__class__, (self._owner, dict(self)))
+
+    def __deepcopy__(self, memo: dict) -> "_TrackedDict": 
+        copied = self.__class__(copy.deepcopy(self._owner, memo), _copyItems(self, memo))
+        memo[id(self)] = copied
+        return copied
+
+    def setSilently(self, key, value): 
+        """
+        Set a value that is derived from the elemId (part of the cache keys), so it's not a change of the element
+        """
+        super().__setitem__(key, value)
+
+    def __setitem__(self, key, value): 
+        super().__setitem__(key, value)
+        self._owner._markChanged()
+
+    def __delitem__(self, key): 
+        super().__delitem__(key)
+        self._owner._markChanged()
+
+    def pop(self, *args): 
+        value = super().pop(*args)
+        self._owner._markChanged()
+        return value
+
+    def popitem(self): 
+        item = super().popitem()
+        self._owner._markChanged()
+        return item
+
+    def setdefault(self, key, default=None): 
+        if key not in self: 
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs): 
+        super().update(*args, **kwargs)
+        self._owner._markChanged()
+
+    def clear(self): 
+        super().clear()
+        self._owner._markChanged()
+
+
+def _copyItems(values: dict, memo: dict) -> dict: 
+    return {k: v if isinstance(v, _ATOMIC_TYPES) else copy.deepcopy(v, memo) for k, v in values.items()}
 
 
 class HTMLElement(object):
+    # if True, the rendered HTML of this element is cached until it (or one of its descendants) changes
+    cacheRender: bool = False
+    # the childrens that are changed or have a changed descendant, the set is created when a children changes
+    _dirtyChildren: frozenset = frozenset()
+    # if False, the childrens are not part of the element state, the element is responsible of rebuilding them
+    _statefulChildrens: bool = True
+
     # base attributes
     def __init__(self, **kwargs):
         """
@@ -40,12 +187,101 @@ class HTMLElement(object):
 
         self._changed: bool = False
 
+    # attributes used for tracking changes, they don't mark the element as changed, 
+    # and are not part of the element state
+    _TRACKING_ATTRS = ("_changed", "_dirtyChildren", "_parent", "_version", "_stateCache", "_fromState")
+
     def __setattr__(self, key, value): 
         # we need to detect that an element has changed, so we can efficiently update the client page 
         # without updating and renderind all the page 
+        if key == "_changed" and value: 
+            # elem._changed = True is the old way to mark an element as changed, the ancestors need to know it too
+            self._markChanged()
+            return
+        if key in self._TRACKING_ATTRS: 
+            super().__setattr__(key, value) 
+            return
+        if key == "childrens": 
+            # the in place changes of the childrens and the attributes need to be detected too
+            value = _TrackedList(self, value)
+            for child in value: 
+                child._parent = self
+        elif key == "attributes" and isinstance(value, dict): 
+            value = _TrackedDict(self, value)
         super().__setattr__(key, value) 
-        if key != "_changed": 
-            super().__setattr__("_changed", True)
+        self._markChanged()
+
+    def _markChanged(self): 
+        """
+        Mark this element as changed, and let the ancestors know that they have a changed descendant, 
+        so renderV2 only needs to walk the dirty paths of the tree. 
+        """
+        super().__setattr__("_changed", True)
+        super().__setattr__("_version", next(_VERSIONS))
+        # the own state of the ancestors is not changed, so they keep their cached JSON
+        self.__dict__.pop("_stateCache", None)
+        marking = True
+        child, parent = self, self.__dict__.get("_parent")
+        while parent is not None: 
+            # the render of the ancestors includes this element, so they need a new version too
+            object.__setattr__(parent, "_version", next(_VERSIONS))
+            if marking: 
+                dirty: set[HTMLElement] = parent.__dict__.setdefault("_dirtyChildren", set())
+                # if the parent was already marked, all the ancestors are marked too
+                marking = not dirty
+                dirty.add(child)
+            child, parent = parent, parent.__dict__.get("_parent")
+
+    def _renewVersions(self): 
+        """
+        Give new versions to this element and its descendants, used when the elements come from 
+        another process (e.g a snapshot), where the versions could collide with the ones of this process. 
+        The cached state is kept, as the content of the elements is the same. 
+        """
+        elems = [self]
+        while elems: 
+            elem = elems.pop()
+            object.__setattr__(elem, "_version", next(_VERSIONS))
+            elems.extend(elem.childrens)
+
+    def _clearChanges(self): 
+        """
+        Mark this element and all its descendants as not changed.
+        """
+        elems = [self]
+        while elems: 
+            elem = elems.pop()
+            object.__setattr__(elem, "_changed", False)
+            elem.__dict__.pop("_dirtyChildren", None)
+            elems.extend(elem.childrens)
+
+    def __deepcopy__(self, memo: dict) -> "HTMLElement": 
+        """
+        Copy this element and its descendants, it's done for each request (Pyfron._getPage), so it's faster 
+        than the default deepcopy: the strings, numbers, functions and cached state are shared with the copy, 
+        and the childrens and attributes are rebuilt without marking the copy as changed. 
+        """
+        cls = self.__class__
+        copied = cls.__new__(cls)
+        memo[id(self)] = copied
+        state = {}
+        for key, value in self.__dict__.items(): 
+            if isinstance(value, _ATOMIC_TYPES) or key == "_stateCache": 
+                pass
+            elif key == "childrens": 
+                value = memo[id(value)] = _TrackedList(copied, [copy.deepcopy(child, memo) for child in value])
+            elif key == "attributes" and isinstance(value, _TrackedDict): 
+                value = memo[id(value)] = _TrackedDict(copied, _copyItems(value, memo))
+            elif key == "_dirtyChildren": 
+                # the childrens are copied last
+                continue
+            else: 
+                value = copy.deepcopy(value, memo)
+            state[key] = value
+        if dirty := self.__dict__.get("_dirtyChildren"): 
+            state["_dirtyChildren"] = {copy.deepcopy(child, memo) for child in dirty}
+        copied.__dict__.update(state)
+        return copied
 
     @staticmethod
     def getBuiltInValue(path: str) -> any:
@@ -62,13 +298,18 @@ class HTMLElement(object):
         """
         if not newId:
             newId = "0"
-        self.elemId = newId
-        # we set to false, because is changed to True when we update the elemId's 
-        self._changed = False
+        # the elemId is part of the render cache key, so this is not a change of the element content
+        object.__setattr__(self, "elemId", newId)
 
-        self.attributes["elemId"] = self.elemId
+        self.attributes.setSilently("elemId", self.elemId)
+        # the onclick listener depends on the elemId, so we keep it updated with it
+        self.addOnClickListener()
         for i, child in enumerate(self.childrens):
+            child._parent = self
             child.updateElemId(f"{self.elemId}-{i}")
+        # we set to false, because is changed to True when we update the elemId's 
+        self._changed = False
+        self.__dict__.pop("_dirtyChildren", None)
 
     def getAttributesString(self) -> str:
         result = ""
@@ -77,9 +318,57 @@ class HTMLElement(object):
         return result
 
     def dumpToDict(self) -> dict:
+        res = self._dumpOwnState()
+        # add the childrens last.
+        res["childrens"] = [ch.dumpToDict() for ch in self.childrens] if self._statefulChildrens else []
+        return res
+
+    def dumpToJSON(self) -> str: 
+        """
+        Same as json.dumps(self.dumpToDict()), but the JSON of the own state of each element is cached 
+        until the element changes, so only the changed elements are serialized again, and the cached 
+        fragments are joined once. 
+        """
+        parts: list[str] = []
+        # the elements, and the separators and closing brackets, in the order that they are written
+        pending: list[Union["HTMLElement", str]] = [self]
+        while pending: 
+            elem = pending.pop()
+            if isinstance(elem, str): 
+                parts.append(elem)
+                continue
+            parts.append(elem._dumpOwnJSON())
+            pending.append("]}")
+            childrens = elem.childrens if elem._statefulChildrens else []
+            for i, child in enumerate(reversed(childrens)): 
+                if i: 
+                    pending.append(", ")
+                pending.append(child)
+        return "".join(parts)
+
+    def _dumpOwnJSON(self) -> str: 
+        """
+        JSON of the own state of this element, opened to add the childrens: '{..., "childrens": ['
+        it's cached until the element changes (the elemId is part of the state, so it's part of the key)
+        """
+        cached = self.__dict__.get("_stateCache")
+        if cached is not None and cached[0] == self.elemId: 
+            return cached[1]
+        # the own state always has the class_ref, so we can remove the closing bracket and add the childrens
+        fragment = json.dumps(self._dumpOwnState())[:-1] + ', "childrens": ['
+        object.__setattr__(self, "_stateCache", (self.elemId, fragment))
+        return fragment
+
+    def _dumpOwnState(self) -> dict:
+        """
+        Dump the state of this element, without the childrens
+        """
         res = {}
         _obj = copy.copy(self.__dict__)
-        childrens = _obj.pop("childrens", [])
+        _obj.pop("childrens", [])
+        for attr in self._TRACKING_ATTRS: 
+            if attr != "_changed": 
+                _obj.pop(attr, None)
         # used to rebuild the obj from a dict
         res["class_ref"] = f"{__name__}__{self.__class__.__name__}"
 
@@ -92,12 +381,8 @@ class HTMLElement(object):
             
 
             elif isinstance(value, dict):
-                for k, v in value.items():
-                    if newVal := cleanValues(v):
-                        value[k] = newVal
-                    else:
-                        value.pop(k)
-                return value
+                # build a new dict, dumping the element should not change it
+                return {k: newVal for k, v in value.items() if (newVal := cleanValues(v))}
 
             elif isinstance(value, list):
                 newList = []
@@ -108,6 +393,10 @@ class HTMLElement(object):
             return None
 
         for k, v in _obj.items():
+            if k == "cacheRender": 
+                # the bools are not supported yet, but this flag can be set in the instances, so we keep it
+                res[k] = bool(v)
+                continue
             clean = cleanValues(v)
             if clean is not None:
                 res[k] = clean
@@ -119,17 +408,16 @@ class HTMLElement(object):
                 # __NTA keyword is filtered in the init function
                 res[k] = f"__NTA__"
 
-        # add the childrens last.
-        res["childrens"] = [ch.dumpToDict() for ch in childrens]
-
         return res
 
     @staticmethod
     def fromDict(rawElem: dict) -> "HTMLElement":
-        childrens: list = rawElem.pop("childrens", [])
+        childrens: list = [HTMLElement.fromDict(ch) for ch in rawElem.pop("childrens", [])]
         parentClass: type = HTMLElement.getBuiltInValue(rawElem["class_ref"])
-        parent: HTMLElement = parentClass(**rawElem)
-        parent.childrens = [HTMLElement.fromDict(ch) for ch in childrens]
+        parent: HTMLElement = parentClass(**rawElem, childrens=childrens)
+        # the elements restored from the client state get new versions on each request, 
+        # so their renders are never used again
+        parent._fromState = True
         return parent
     
     def prepare(self, remoteState: Optional[dict] = None): 
@@ -178,8 +466,7 @@ class HTMLElement(object):
 
     def addOnClickListener(self):
         if getattr(self, "onClick", None):
-            k = {"onclick": f"onClickListener('{self.elemId}')"}
-            self.moveValuesToAttrs(k, ["onclick"])
+            self.attributes.setSilently("onclick", f"onClickListener('{self.elemId}')")
 
     def renderV2(self, *args, **kwargs) -> Union[dict, str]: 
         """
@@ -188,24 +475,51 @@ class HTMLElement(object):
         BEWARE, when this method is called we already asumme that the client page has the JS support files, etc, so we don't 
         send them again here 
         """
+        # the render could update the attributes of the elements, so we dump the state after it
+        changes = self.getChanges(*args, **kwargs)
+        return {"state": self.dumpToDict(), "changes": changes}
+
+    def renderV2JSON(self, *args, **kwargs) -> str: 
+        """
+        Same as renderV2, but already encoded to JSON, the state is spliced from the cached JSON 
+        of the elements, so only the changed elements are serialized again. 
+        """
+        # the render could update the attributes of the elements, so we dump the state after it
+        changes = json.dumps(self.getChanges(*args, **kwargs))
+        state = self.dumpToJSON()
+        return '{"state": ' + state + ', "changes": ' + changes + "}"
+
+    def getChanges(self, *args, **kwargs) -> dict[str, str]: 
+        """
+        Render the elements that have changed since the last call, 
+        only the paths of the tree that have a changed element are visited, so the cost 
+        depends on the number of changes, not on the size of the page. 
+        """
         # a mapping of class str : rendered object HTML string 
         changes: dict[str, str] = {}
 
+        visited: list[HTMLElement] = []
+        rendered: list[HTMLElement] = []
         elems = deque([self])
-        level = 0
         while elems: 
-            l = len(elems) 
-            for _ in range(l): 
-                elem = elems.pop()
-                if elem._changed: 
-                    # we send level = 1000 so we don't treat this as a upper level item 
-                    changes[elem.class_name] = elem.render(level=-1, *args, **kwargs)
-                else: 
-                    for el in elem.childrens: 
+            elem = elems.pop()
+            if elem._changed: 
+                # we send level = -1 so we don't treat this as a upper level item 
+                changes[elem.class_name] = elem.render(level=-1, *args, **kwargs)
+                rendered.append(elem)
+            elif elem._dirtyChildren: 
+                visited.append(elem)
+                for el in elem._dirtyChildren: 
+                    # the element could have been removed from this parent
+                    if el.__dict__.get("_parent") is elem: 
                         elems.appendleft(el)
-            level += 1
 
-        return {"state": self.dumpToDict(), "changes": changes}
+        # the client is up to date now, so the next call only sends the new changes
+        for elem in rendered: 
+            elem._clearChanges()
+        for elem in visited: 
+            elem.__dict__.pop("_dirtyChildren", None)
+        return changes
 
     def getStyle(self, level: int = 0) -> str: 
         """
@@ -215,7 +529,7 @@ class HTMLElement(object):
         return f"style='{self.style}'"
     
     def getJSSupportScripts(self): 
-        script = f"<script>let page_props = {self.dumpToDict()}; </script>"
+        script = f"<script>let page_props = {self.dumpToJSON()}; </script>"
         # only add the js support script one time
         script += JS_SUPPORT_SCRIPT
         return script 
@@ -226,6 +540,25 @@ class HTMLElement(object):
         if not self.elemId:
             self.updateElemId()
 
+        if self.cacheRender and not self.__dict__.get("_fromState"): 
+            # the html only depends on the element version, the elemId and if the style is inlined
+            key = (self._version, self.elemId, level == -1)
+            content = RENDER_CACHE.getOrRender(key, lambda: self.renderContent(level))
+        else: 
+            content = self.renderContent(level)
+
+        if level == 0:
+            # add the js support things for this page! 
+            content += self.getJSSupportScripts()
+            # add the css to this page!
+            content += f"<style>{self.renderStyle()}</style>"
+
+        return content
+
+    def renderContent(self, level: int = 0) -> str: 
+        """
+        Render the html of this element and its childrens
+        """
         # add the onClickListener to the object if needed
         self.addOnClickListener()
 
@@ -238,25 +571,18 @@ class HTMLElement(object):
         if level == -1: 
             style = self.getStyle() 
 
-        content = f"<{self.tag} {attributes} {style}>{self.text}"
+        content = [f"<{self.tag} {attributes} {style}>{self.text}"]
         for children in self.childrens:
             # TODO we can do this without recursion
             # if level == -1 we want to keep it as it is 
-            content += children.render(
+            content.append(children.render(
                     level=level if level ==  -1 
                     else (level + 1) 
-            )
+            ))
 
         # close the html thingy
-        content += f"</{self.tag}>"
-
-        if level == 0:
-            # add the js support things for this page! 
-            content += self.getJSSupportScripts()
-            # add the css to this page!
-            content += f"<style>{self.renderStyle()}</style>"
-
-        return content
+        content.append(f"</{self.tag}>")
+        return "".join(content)
 
     def findChildrenByElemId(self, elemId: str):
         childrenList = list(reversed(elemId.split("-")))
@@ -315,8 +641,9 @@ class HTMLElement(object):
                     f"element with id: {element.elemId} has no parent"
                 )
             parentElement = self.findChildrenByElemId(parentElemId)
-            parentElement._changed = True
+            parentElement._markChanged()
             parentElement.childrens.remove(element)
+            element._parent = None
         except (ElementNotFound, ValueError, IndexError) as e:
             if not _raise:
                 pass
@@ -341,24 +668,30 @@ class HTMLElement(object):
             parentElement = self.findElementsByClassName(parent)[0]
         else: 
             parentElement = parent
-        parentElement._changed = True
+        parentElement._markChanged()
+        element._parent = parentElement
         if index is not None: 
             parentElement.childrens.insert(index, element)
         else: 
             parentElement.childrens.append(element)
     
 
-    def onsubmitRequest(self, event: dict):
-        # we need to find the target element
-        targetId = event["target"]
-        targetElement: Optional[HTMLElement] = self.findChildrenByElemId(targetId)
+    def onsubmitRequest(self, event: dict, targetElement: Optional["HTMLElement"] = None):
+        # we need to find the target element (if it's not already found)
+        if targetElement is None: 
+            targetElement = self.findChildrenByElemId(event["target"])
         return targetElement.onSubmit(event, self)
 
-    def onclickRequest(self, event: dict):
-        targetId = event["target"]
-        targetElement: Optional[HTMLElement] = self.findChildrenByElemId(targetId)
+    def onclickRequest(self, event: dict, targetElement: Optional["HTMLElement"] = None):
+        if targetElement is None: 
+            targetElement = self.findChildrenByElemId(event["target"])
         return targetElement.onClick(self)
 
+    def onscrollRequest(self, event: dict, targetElement: Optional["HTMLElement"] = None):
+        if targetElement is None: 
+            targetElement = self.findChildrenByElemId(event["target"])
+        return targetElement.onScroll(event, self)
+
     def moveValuesToAttrs(self, kwargs: dict, keys: list[str]):
         if not getattr(self, "attributes", None):
             self.attributes = {}
@@ -387,6 +720,18 @@ class Page(HTMLElement):
             result += f"<style>{self.style}</style>"
         return result
 
+    def renderNavigationJSON(self) -> str: 
+        """
+        Render the page for a client that navigates to it from another pyfron page, the client already has 
+        the js support script, so we only send the body (with the styles) and the state, encoded to JSON 
+        in the same format as renderV2JSON. 
+        """
+        if not self.elemId: 
+            self.updateElemId()
+        body = self.renderContent() + f"<style>{self.renderStyle()}</style><style>{self.style}</style>"
+        changes = json.dumps({self.class_name: body})
+        return '{"state": ' + self.dumpToJSON() + ', "changes": ' + changes + "}"
+
 
 class Form(HTMLElement):
     def __init__(self, **kwargs):
@@ -440,9 +785,24 @@ class Button(HTMLElement):
 class Link(HTMLElement):
     def __init__(self, **kwargs):
         kwargs["tag"] = "a"
-        self.moveValuesToAttrs(kwargs, ["href"])
+        # the client navigates to the pyfron pages without reloading the page, by default the links 
+        # to local paths that are not static files, clientNavigation=True/False overrides it
+        clientNavigation = kwargs.pop("clientNavigation", None)
+        if "href" in kwargs: 
+            if clientNavigation is None: 
+                clientNavigation = self.isPageLink(kwargs["href"])
+            if clientNavigation: 
+                kwargs["pyfron_link"] = "true"
+        self.moveValuesToAttrs(kwargs, ["href", "pyfron_link"])
         super(Link, self).__init__(**kwargs)
 
+    @staticmethod
+    def isPageLink(href: str) -> bool: 
+        """
+        Returns true if the href looks like the path of a pyfron page
+        """
+        return href.startswith("/") and not href.startswith(("//", "/static/"))
+
 
 class Div(HTMLElement):
     ...
@@ -463,6 +823,51 @@ class Option(HTMLElement):
         super(Option, self).__init__(**kwargs)
 
 
+class VirtualList(HTMLElement):
+    """
+    List that only renders a window of rows, the rows are fetched from the dataSource when needed, 
+    so the rows that are not rendered are never part of the page (or the page state). 
+    dataSource: callable(offset: int, count: int) -> list[HTMLElement], it should be a module level function, 
+    so it can be restored from the page state. 
+    The client sends a scroll event when the user reaches the end (or the start) of the list, 
+    and the list moves to the next (or previous) window. 
+    """
+    # the rows are fetched again from the dataSource, we don't need to send them in the state
+    _statefulChildrens: bool = False
+
+    def __init__(self, **kwargs):
+        kwargs.pop("childrens", None)
+        kwargs.setdefault("offset", 0)
+        kwargs.setdefault("windowSize", 50)
+        kwargs.setdefault("style", "overflow-y: auto; max-height: 500px;")
+        super(VirtualList, self).__init__(**kwargs)
+        self.attributes["virtual_list"] = "true"
+        self.loadRows()
+        self._changed = False
+
+    def loadRows(self, offset: Optional[int] = None) -> bool: 
+        """
+        Load the window of rows that starts at the given offset, 
+        returns False if there are no rows there (and keeps the current ones) 
+        """
+        if offset is None: 
+            offset = self.offset
+        rows = list(self.dataSource(offset, self.windowSize))
+        if not rows and self.childrens: 
+            return False
+        self.offset = offset
+        self.childrens = rows
+        if self.elemId: 
+            self.updateElemId(self.elemId)
+        return True
+
+    def onScroll(self, event: dict, document: HTMLElement): 
+        step = self.windowSize if event.get("direction") == "next" else -self.windowSize
+        offset = max(self.offset + step, 0)
+        if offset != self.offset and self.loadRows(offset): 
+            self._markChanged()
+
+
 class RawHTMLElement(HTMLElement):
     # TODO support parsing from HTML to HTMLElement, and do that in the init based on the filename
     def render(self, *args, **kwargs):
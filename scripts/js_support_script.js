@@ -41,22 +41,84 @@ function updatePageFromChanges(changes) {
     } 
 } 
 
-//handler for the user clicks
-function onClickListener(elemId) { 
-    toSend = {state: page_props, eventType: 'click', target: elemId};
-    postData(getCurrentURL() + "/onEvent", toSend).then(response => { 
-        let body = document.getElementsByTagName("body")[0];
+// the events that happen in this window of time (ms) are sent together to the server
+const EVENTS_BATCH_WINDOW = 25;
+let queuedEvents = [];
+// called with the response of the batch of each queued event (or null if the request fails) 
+let queuedCallbacks = [];
+let sendingEvents = false;
+let flushEventsTimeout = null;
+// called when all the queued events are sent (see waitForQueuedEvents) 
+let drainedCallbacks = [];
+// increased each time that the client navigates to another page, the responses of the previous pages are dropped 
+let pageGeneration = 0;
+
+function queueEvent(event, callback) { 
+    queuedEvents.push(event);
+    if (callback) { 
+        queuedCallbacks.push(callback);
+    } 
+    if (!sendingEvents && flushEventsTimeout === null) { 
+        flushEventsTimeout = setTimeout(flushEvents, EVENTS_BATCH_WINDOW);
+    } 
+} 
+
+// send all the queued events in one request, the events queued while the request is 
+// in flight are sent when it finishes, so they use the updated page state 
+function flushEvents() { 
+    flushEventsTimeout = null;
+    if (sendingEvents || queuedEvents.length == 0) { 
+        return;
+    } 
+    sendingEvents = true;
+    toSend = {state: page_props, events: queuedEvents};
+    let callbacks = queuedCallbacks;
+    let generation = pageGeneration;
+    queuedEvents = [];
+    queuedCallbacks = [];
+    // the events belong to the page that is shown, not to the url (it changes before the page on popstate) 
+    postData(window.location.origin + currentPage + "/onEvents", toSend).then(response => { 
+        if (generation != pageGeneration) { 
+            throw new Error("the client navigated to another page");
+        } 
         let asJson = JSON.parse(response) 
         updatePageFromChanges(asJson.changes) 
-        let state = asJson.state;
-        page_props = state;
+        page_props = asJson.state;
+        callbacks.forEach(callback => callback(asJson));
+    }).catch(() => { 
+        callbacks.forEach(callback => callback(null));
+    }).finally(() => { 
+        sendingEvents = false;
+        flushEvents();
+        if (!sendingEvents) { 
+            let drained = drainedCallbacks;
+            drainedCallbacks = [];
+            drained.forEach(callback => callback());
+        } 
     })
+} 
+
+// send the queued events now, the promise is resolved when all of them (and the batch in flight) are sent 
+function waitForQueuedEvents() { 
+    if (flushEventsTimeout !== null) { 
+        clearTimeout(flushEventsTimeout);
+        flushEvents();
+    } 
+    if (!sendingEvents) { 
+        return Promise.resolve();
+    } 
+    return new Promise(resolve => drainedCallbacks.push(resolve));
+} 
+
+//handler for the user clicks
+function onClickListener(elemId) { 
+    queueEvent({eventType: 'click', target: elemId});
 }
 
 // Function to handle when the user submits a form (for example) 
 function onSubmitListener(event) { 
     parent = event.srcElement;
-    toSend = {state: page_props, eventType: 'submit', target: parent.attributes.elemId.nodeValue};
+    toSend = {eventType: 'submit', target: parent.attributes.elemId.nodeValue};
     stack = [parent];
     while(stack.length > 0) { 
         let actual = stack.pop();
@@ -70,14 +132,120 @@ function onSubmitListener(event) {
     }
 
     //send this to the frontend backend 
-    postData(getCurrentURL() + "/onEvent", toSend).then(response => { 
-        let body = document.getElementsByTagName("body")[0];
+    queueEvent(toSend);
+    event.preventDefault();
+} 
+
+// Function to handle when the user reaches the end (or the start) of a virtual list 
+let loadingVirtualList = false;
+function onScrollListener(event) { 
+    let list = event.target;
+    if (loadingVirtualList || !list.attributes || !list.attributes.virtual_list) { 
+        return;
+    } 
+    let direction = null;
+    if (list.scrollTop + list.clientHeight >= list.scrollHeight - 1) { 
+        direction = 'next';
+    } else if (list.scrollTop == 0) { 
+        direction = 'previous';
+    } 
+    if (!direction) { 
+        return;
+    } 
+    loadingVirtualList = true;
+    let className = list.attributes.class.nodeValue;
+    toSend = {eventType: 'scroll', target: list.attributes.elemId.nodeValue, direction: direction};
+    queueEvent(toSend, asJson => { 
+        loadingVirtualList = false;
+        // leave some space to keep scrolling in the same direction 
+        let newList = document.getElementsByClassName(className)[0];
+        if (asJson && newList && className in asJson.changes) { 
+            newList.scrollTop = direction == 'next' ? 1 : newList.scrollHeight - newList.clientHeight - 1;
+        } 
+    });
+} 
+
+// pages prefetched when the user hovers a link, url -> promise of the response 
+let prefetchedPages = {};
+
+// the page that the client is showing (without the hash) 
+function getCurrentPage() { 
+    return window.location.pathname + window.location.search;
+} 
+
+function getPyfronLink(element) { 
+    let link = element.closest ? element.closest("a[pyfron_link]") : null;
+    if (!link || link.origin != window.location.origin || link.target || link.pathname.startsWith("/static/")) { 
+        return null;
+    } 
+    // links to the same page (e.g anchors) are handled by the browser 
+    if (link.pathname + link.search == getCurrentPage()) { 
+        return null;
+    } 
+    return link;
+} 
+
+function fetchPage(url) { 
+    let path = new URL(url).pathname.replace(/\/$/, "");
+    return fetch(path + "/onNavigate", {credentials: 'same-origin'}).then(response => { 
+        if (!response.ok) { 
+            throw new Error("navigation failed: " + response.status);
+        } 
+        return response.text();
+    });
+} 
+
+// navigate to another pyfron page without reloading, keeping the js runtime and the websocket alive 
+function navigate(url, pushState) { 
+    let request = prefetchedPages[url] || fetchPage(url);
+    delete prefetchedPages[url];
+    // the queued events target the elements of the current page, so they are sent before leaving it 
+    Promise.all([request, waitForQueuedEvents()]).then(([response]) => { 
         let asJson = JSON.parse(response) 
+        pageGeneration++;
+        // the events queued since then can't be sent to the new page 
+        clearTimeout(flushEventsTimeout);
+        flushEventsTimeout = null;
+        queuedEvents = [];
+        queuedCallbacks.forEach(callback => callback(null));
+        queuedCallbacks = [];
         updatePageFromChanges(asJson.changes) 
-        let state = asJson.state;
-        page_props = state;
+        page_props = asJson.state;
+        if (pushState) { 
+            history.pushState({}, "", url);
+        } 
+        currentPage = getCurrentPage();
+        let anchor = window.location.hash ? document.getElementById(window.location.hash.slice(1)) : null;
+        if (anchor) { 
+            anchor.scrollIntoView();
+        } else { 
+            window.scrollTo(0, 0);
+        } 
+        if (pyfronWebsocket && pyfronWebsocket.readyState === 1) { 
+            notifyWebsocketLocation(pyfronWebsocket);
+        } 
+    }).catch(() => { 
+        // fallback to a normal navigation 
+        window.location.href = url;
     })
+} 
+
+function onLinkClickListener(event) { 
+    let link = getPyfronLink(event.target);
+    if (!link || event.defaultPrevented || event.button != 0 || event.metaKey || event.ctrlKey || event.shiftKey || event.altKey) { 
+        return;
+    } 
     event.preventDefault();
+    navigate(link.href, true);
+} 
+
+function onLinkHoverListener(event) { 
+    let link = getPyfronLink(event.target);
+    if (link && !(link.href in prefetchedPages)) { 
+        prefetchedPages[link.href] = fetchPage(link.href);
+        // a failed prefetch is retried when the user clicks the link 
+        prefetchedPages[link.href].catch(() => { delete prefetchedPages[link.href]; });
+    } 
 } 
 
 function receiveWebsocketMessages(websocket) { 
@@ -103,12 +271,25 @@ function waitForSocketConnection(websocket, callback) {
         }, 1);
     } 
 } 
+let pyfronWebsocket = null;
+let currentPage = getCurrentPage();
 function main() { 
     let b = document.getElementsByTagName("body")[0];
     b.addEventListener('submit', onSubmitListener);
+    b.addEventListener('click', onLinkClickListener);
+    b.addEventListener('mouseover', onLinkHoverListener);
+    window.addEventListener('popstate', () => { 
+        // the hash changes are handled by the browser 
+        if (getCurrentPage() != currentPage) { 
+            navigate(getCurrentURL(), false);
+        } 
+    });
+    // the scroll event does not bubble, so we need to capture it
+    b.addEventListener('scroll', onScrollListener, true);
 
     //try to add websocket support! 
     const websocket = new WebSocket("ws://localhost:8001/");
+    pyfronWebsocket = websocket;
     waitForSocketConnection(websocket, () => { 
         notifyWebsocketLocation(websocket); 
         receiveWebsocketMessages(websocket); 
@@ -0,0 +1,188 @@
+"""
+Prebuilt snapshot of the pages of a pyfron application.
+
+Building the pages (importing the user modules and creating all the HTMLElements) is slow
+for big applications, so the pages can be built once, and saved to a snapshot file
+together with their render, that is loaded lazily (and memory mapped) when the server starts.
+
+build a snapshot (from the folder that contains the pyfron package):
+    python -m pyfron.snapshot {module}:{application} {filename}
+"""
+from collections.abc import MutableMapping
+from hashlib import sha1
+from importlib import import_module
+from typing import TYPE_CHECKING, Callable, Iterator
+import json
+import mmap
+import os
+import pickle
+import sys
+
+from pyfron.constants import JS_SUPPORT_SCRIPT
+from pyfron.exceptions import InvalidSnapshot
+from pyfron.htmlelement import HTMLElement
+
+if TYPE_CHECKING:
+    from pyfron.base import Pyfron
+
+SNAPSHOT_MAGIC = "pyfron-snapshot"
+# increase this when the format of the snapshot, or the pickled elements change
+SNAPSHOT_VERSION = 2
+
+
+def _scriptHash() -> str:
+    # the renders contain the js support script, they are not valid if it changes
+    return sha1(JS_SUPPORT_SCRIPT.encode()).hexdigest()
+
+
+class _LazyMapping(MutableMapping):
+    """
+    Mapping of path -> value, the values are loaded from the snapshot data the first time that they are used.
+    """
+    def __init__(self, data: mmap.mmap, offset: int, index: dict[str, list[int]], load: Callable[[bytes], any]):
+        self._data = data
+        self._offset = offset
+        self._index = index
+        self._load = load
+        self._loaded: dict[str, any] = {}
+        self._deleted: set[str] = set()
+
+    def __getitem__(self, path: str):
+        if path in self._loaded:
+            return self._loaded[path]
+        if path in self._deleted or path not in self._index:
+            raise KeyError(path)
+        start, length = self._index[path]
+        start += self._offset
+        value = self._loaded[path] = self._load(self._data[start:start + length])
+        return value
+
+    def __setitem__(self, path: str, value):
+        self._deleted.discard(path)
+        self._loaded[path] = value
+
+    def __delitem__(self, path: str):
+        if path not in self:
+            raise KeyError(path)
+        self._loaded.pop(path, None)
+        self._deleted.add(path)
+
+    def __contains__(self, path) -> bool:
+        return path in self._loaded or (path in self._index and path not in self._deleted)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._loaded
+        for path in self._index:
+            if path not in self._loaded and path not in self._deleted:
+                yield path
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class Snapshot:
+    """
+    A snapshot file loaded in memory (memory mapped),
+    pages: mapping path -> page, the pages are unpickled when they are used for the first time
+    renders: mapping path -> render of a fresh copy of the page (what a GET request returns)
+    """
+    def __init__(self, filename: str):
+        with open(filename, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise InvalidSnapshot(f"{filename} is empty")
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._loadHeader(filename)
+        except InvalidSnapshot:
+            self.close()
+            raise
+
+    def _loadHeader(self, filename: str):
+        headerEnd = self._data.find(b"\n")
+        if headerEnd == -1:
+            raise InvalidSnapshot(f"{filename} is not a pyfron snapshot")
+        try:
+            header: dict = json.loads(self._data[:headerEnd])
+        except ValueError:
+            raise InvalidSnapshot(f"{filename} is not a pyfron snapshot")
+        if not isinstance(header, dict) or header.get("magic") != SNAPSHOT_MAGIC:
+            raise InvalidSnapshot(f"{filename} is not a pyfron snapshot")
+        if header.get("version") != SNAPSHOT_VERSION:
+            raise InvalidSnapshot(
+                f"{filename} was built with snapshot version {header.get('version')}, expected {SNAPSHOT_VERSION}"
+            )
+        if header.get("script") != _scriptHash():
+            raise InvalidSnapshot(f"{filename} was built with a different js support script")
+
+        offset = headerEnd + 1
+        # a truncated file would fail when loading the last pages, we better fail now
+        size = len(self._data) - offset
+        for kind in ("pages", "renders"):
+            if not isinstance(header.get(kind), dict):
+                raise InvalidSnapshot(f"{filename} has no {kind} index")
+            if any(start + length > size for start, length in header[kind].values()):
+                raise InvalidSnapshot(f"{filename} is truncated")
+
+        self.pages = _LazyMapping(self._data, offset, header["pages"], self._loadPage)
+        self.renders = _LazyMapping(self._data, offset, header["renders"], bytes.decode)
+
+    def close(self):
+        """
+        Close the memory mapped file, the pages and renders that are not loaded yet can't be used after this
+        """
+        self._data.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def _loadPage(raw: bytes) -> HTMLElement:
+        page: HTMLElement = pickle.loads(raw)
+        page._renewVersions()
+        return page
+
+
+def buildSnapshot(app: "Pyfron", filename: str):
+    """
+    Save the pages of the application, and their render, to a snapshot file.
+    The event handlers of the pages should be module level functions, so they can be pickled.
+    """
+    index: dict[str, dict[str, list[int]]] = {"pages": {}, "renders": {}}
+    chunks: list[bytes] = []
+    size = 0
+
+    def addChunk(kind: str, path: str, chunk: bytes):
+        nonlocal size
+        index[kind][path] = [size, len(chunk)]
+        chunks.append(chunk)
+        size += len(chunk)
+
+    for path in list(app.pages):
+        page: HTMLElement = app.pages[path]
+        # rendering the page also precomputes the ids and the state, so the copies of the page don't need to do it
+        render = page.render()
+        addChunk("pages", path, pickle.dumps(page, protocol=pickle.HIGHEST_PROTOCOL))
+        addChunk("renders", path, render.encode())
+
+    header = {"magic": SNAPSHOT_MAGIC, "version": SNAPSHOT_VERSION, "script": _scriptHash(), **index}
+    with open(filename, "wb") as f:
+        f.write(json.dumps(header).encode() + b"\n")
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def loadSnapshot(filename: str) -> Snapshot:
+    return Snapshot(filename)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python -m pyfron.snapshot {module}:{application} {filename}")
+        sys.exit(1)
+    moduleName, appName = sys.argv[1].split(":")
+    buildSnapshot(getattr(import_module(moduleName), appName), sys.argv[2])
+    print(f"snapshot saved to: {sys.argv[2]}")
@@ -0,0 +1,197 @@
+import json
+
+from ..benchmarks.helpers import DummyBackend
+from ..base import Pyfron
+from ..htmlelement import Button, Div, P, Page
+
+
+def addRow(document): 
+    rows = document.findElementsByClassName("rows")[0]
+    document.addElement(rows, P(class_name=f"row_{len(rows.childrens)}", text="row"))
+
+
+def insertFirstRow(document): 
+    rows = document.findElementsByClassName("rows")[0]
+    document.addElement(rows, P(class_name="inserted", text="inserted"), index=0)
+
+
+def removeFirstRow(document): 
+    rows = document.findElementsByClassName("rows")[0]
+    document.removeElement(rows.childrens[0])
+
+
+def buildApp() -> Pyfron: 
+    page = Page(
+        path="/test", 
+        childrens=[
+            Button(class_name="add_row", text="add", onClick=addRow), 
+            Div(class_name="rows"), 
+            P(class_name="footer", text="footer"), 
+        ],
+    )
+    return Pyfron([page], DummyBackend)
+
+
+def test_pyfron_onEvents(): 
+    app = buildApp()
+    state = app._getPage("/test").dumpToDict()
+    batch = {"state": state, "events": [{"eventType": "click", "target": "0-0"} for _ in range(3)]}
+
+    result = json.loads(app.onEvents("/test", batch))
+    # the changes of all the events are sent at once
+    assert list(result["changes"].keys()) == ["rows"]
+    assert result["changes"]["rows"].count("<p") == 3
+    assert len(result["state"]["childrens"][1]["childrens"]) == 3
+
+
+def test_pyfron_onEvents_wrongEvent(): 
+    app = buildApp()
+    state = app._getPage("/test").dumpToDict()
+    batch = {"state": state, "events": [{"eventType": "click", "target": "0-0"}, {"eventType": "hover", "target": "0-0"}]}
+    assert app.onEvents("/test", batch) == ("WRONG_EVENT", 500)
+
+
+def test_pyfron_getReusesCachedState(monkeypatch): 
+    from .. import htmlelement
+
+    app = buildApp()
+    page = app._getPage("/test")
+    page.render()
+    expected = json.loads(page.dumpToJSON())
+
+    calls = []
+    dumps = htmlelement.json.dumps
+    monkeypatch.setattr(htmlelement.json, "dumps", lambda *args, **kwargs: calls.append(args) or dumps(*args, **kwargs))
+    for _ in range(3): 
+        html = app.onEvent("/test", {})
+    # the copies of the page inherit the state that was cached when the page was added
+    assert not calls
+    state = html.split("let page_props = ", 1)[1].split("; </script>", 1)[0]
+    assert json.loads(state) == expected
+
+
+def test_pyfron_onNavigate(): 
+    app = buildApp()
+    result = json.loads(app.onNavigate("/test"))
+    # the client already has the js support script, we only send the body and the state
+    body = result["changes"]["pyfron_body"]
+    assert "add_row" in body and "<script>" not in body
+    page = app._getPage("/test")
+    page.render()
+    assert result["state"] == json.loads(page.dumpToJSON())
+    assert app.onNavigate("/not_found") == ("", 400)
+
+
+def test_pyfron_websocketNavigation(): 
+    import asyncio
+
+    visits = []
+
+    async def onWebSocketConnection(websocket, document, application): 
+        visits.append(document.path)
+        await asyncio.sleep(10)
+
+    class QueueBackend(DummyBackend): 
+        async def getRawWebsocketMessage(self, websocket) -> str: 
+            return await websocket.get()
+
+    app = Pyfron(
+        [
+            Page(path="/first", onWebSocketConnection=onWebSocketConnection), 
+            Page(path="/second", onWebSocketConnection=onWebSocketConnection), 
+        ],
+        QueueBackend,
+    )
+
+    async def run(): 
+        websocket = asyncio.Queue()
+        connection = asyncio.ensure_future(app.handleWebsocketConnection(websocket))
+        for pageId in ("/first", "/second"): 
+            await websocket.put(json.dumps({"type": "locationUpdate", "pageId": pageId}))
+            await asyncio.sleep(0.01)
+        connection.cancel()
+
+    asyncio.run(run())
+    assert visits == ["/first", "/second"]
+
+
+def buildRowsApp() -> Pyfron: 
+    page = Page(
+        path="/rows", 
+        childrens=[
+            Div(
+                class_name="rows", 
+                childrens=[
+                    Button(class_name="insert", text="insert", onClick=insertFirstRow), 
+                    Button(class_name="remove", text="remove", onClick=removeFirstRow), 
+                    Button(class_name="last", text="last", onClick=lastClicked), 
+                ],
+            ),
+        ],
+    )
+    return Pyfron([page], DummyBackend)
+
+
+def lastClicked(document): 
+    document.findElementsByClassName("last")[0].text = "clicked"
+
+
+def test_pyfron_onEvents_targetsFromClientState(): 
+    app = buildRowsApp()
+    state = app._getPage("/rows").dumpToDict()
+
+    # the first event inserts a sibling before the target of the second one
+    batch = {"state": state, "events": [{"eventType": "click", "target": "0-0-0"}, {"eventType": "click", "target": "0-0-2"}]}
+    result = json.loads(app.onEvents("/rows", json.loads(json.dumps(batch))))
+    rows = result["state"]["childrens"][0]["childrens"]
+    assert [r["class_name"] for r in rows] == ["inserted", "insert", "remove", "last"]
+    assert rows[3]["text"] == "clicked"
+    # the insert button was not clicked again
+    assert len(rows) == 4
+
+    # the first event removes a sibling, the index of the second target is out of range after it
+    batch = {"state": state, "events": [{"eventType": "click", "target": "0-0-1"}, {"eventType": "click", "target": "0-0-2"}]}
+    result = json.loads(app.onEvents("/rows", json.loads(json.dumps(batch))))
+    rows = result["state"]["childrens"][0]["childrens"]
+    assert [r["class_name"] for r in rows] == ["remove", "last"]
+    assert rows[1]["text"] == "clicked"
+
+
+def test_pyfron_onEvents_wrongTarget(): 
+    app = buildRowsApp()
+    state = app._getPage("/rows").dumpToDict()
+    batch = {"state": state, "events": [{"eventType": "click", "target": "0-0-0"}, {"eventType": "click", "target": "0-0-9"}]}
+    assert app.onEvents("/rows", batch) == ("WRONG_TARGET", 400)
+
+
+def test_pyfron_websocketForwardsMessages(caplog): 
+    import asyncio
+
+    received = []
+
+    async def echoMessages(websocket, document, application): 
+        for _ in range(3): 
+            received.append(await websocket.recv())
+        raise RuntimeError("handler failed")
+
+    class QueueBackend(DummyBackend): 
+        async def getRawWebsocketMessage(self, websocket) -> str: 
+            return await websocket.get()
+
+    app = Pyfron([Page(path="/echo", onWebSocketConnection=echoMessages)], QueueBackend)
+
+    async def run(): 
+        websocket = asyncio.Queue()
+        connection = asyncio.ensure_future(app.handleWebsocketConnection(websocket))
+        await websocket.put(json.dumps({"type": "locationUpdate", "pageId": "/echo"}))
+        # the messages can be in any format, they reach the handler as they were sent
+        for message in ('{"type":  "chat", "text": "hello"}', "not json", "[1, 2]"): 
+            await websocket.put(message)
+        await asyncio.sleep(0.01)
+        connection.cancel()
+
+    asyncio.run(run())
+    # the messages that are not a locationUpdate reach the page handler
+    assert received == ['{"type":  "chat", "text": "hello"}', "not json", "[1, 2]"]
+    # and the errors of the handler are logged
+    assert "handler failed" in caplog.text
@@ -1,4 +1,4 @@
-from ..htmlelement import HTMLElement 
+from ..htmlelement import HTMLElement, P, Page, VirtualList
 
 def test_htmlElement_render(): 
     htmlElement = HTMLElement(
@@ -66,3 +66,308 @@ def test_htmlElementNested_renderV2():
     ) 
 
 
+
+
+def _buildNestedPage(width: int, depth: int, prefix: str = "elem") -> HTMLElement: 
+    if depth == 0: 
+        return HTMLElement(class_name=prefix, text="leaf")
+    return HTMLElement(
+        class_name=prefix, 
+        childrens=[
+            _buildNestedPage(width, depth - 1, f"{prefix}_{i}") for i in range(width)
+        ],
+    )
+
+
+def test_htmlElement_dirtyChildrenPropagation(): 
+    htmlElement = _buildNestedPage(width=3, depth=3)
+    htmlElement.updateElemId()
+    assert not htmlElement._changed and not htmlElement._dirtyChildren
+
+    leaf = htmlElement.findChildrenByElemId("0-1-2-0")
+    leaf.text = "changed"
+    assert leaf._changed
+    # all the ancestors know that they have a changed descendant
+    assert htmlElement._dirtyChildren
+    assert htmlElement.childrens[1]._dirtyChildren
+    assert htmlElement.childrens[1].childrens[2]._dirtyChildren
+    # but the rest of the tree is untouched
+    assert not htmlElement.childrens[0]._dirtyChildren
+    assert not htmlElement.childrens[1].childrens[2]._changed
+
+    changes = htmlElement.getChanges()
+    assert list(changes.keys()) == ["elem_1_2_0"]
+    assert "changed" in changes["elem_1_2_0"]
+
+    # once sent, the changes are cleared
+    assert not htmlElement._dirtyChildren and not leaf._changed
+    assert not htmlElement.getChanges()
+
+
+def test_htmlElement_changedFlagMarksAncestors(): 
+    htmlElement = _buildNestedPage(width=3, depth=3)
+    htmlElement.updateElemId()
+    leaf = htmlElement.findChildrenByElemId("0-2-1-0")
+    version = htmlElement._version
+
+    leaf._changed = True
+    assert htmlElement._version != version
+    assert list(htmlElement.getChanges()) == ["elem_2_1_0"]
+
+
+def test_htmlElement_addElementMarksParent(): 
+    htmlElement = _buildNestedPage(width=2, depth=2)
+    htmlElement.updateElemId()
+
+    htmlElement.addElement("elem_1", HTMLElement(class_name="new_elem", text="new"))
+    changes = htmlElement.getChanges()
+    assert list(changes.keys()) == ["elem_1"]
+    assert "new_elem" in changes["elem_1"]
+
+
+def rowsDataSource(offset: int, count: int) -> list[HTMLElement]: 
+    return [
+        P(class_name=f"row_{i}", text=f"row {i}") for i in range(offset, min(offset + count, 120))
+    ]
+
+
+def test_virtualList_onlyRendersWindow(): 
+    page = Page(
+        path="/test", 
+        childrens=[VirtualList(class_name="rows", dataSource=rowsDataSource, windowSize=50)],
+    )
+    page.prepare()
+    rendered = page.render()
+    assert "row 49" in rendered and "row 50" not in rendered
+
+    # the rows are not part of the state, they are fetched again from the data source
+    state = page.dumpToDict()
+    assert state["childrens"][0]["childrens"] == []
+    restored = HTMLElement.fromDict(state)
+    assert [r.text for r in restored.childrens[0].childrens] == [f"row {i}" for i in range(50)]
+
+
+def test_virtualList_onScroll(): 
+    page = Page(
+        path="/test", 
+        childrens=[VirtualList(class_name="rows", dataSource=rowsDataSource, windowSize=50)],
+    )
+    page.prepare()
+    page.onscrollRequest({"target": "0-0", "direction": "next"})
+    changes = page.getChanges()
+    assert "row 50" in changes["rows"] and "row 49" not in changes["rows"]
+    assert page.childrens[0].childrens[0].elemId == "0-0-0"
+
+    # there are no more rows after the last window
+    page.onscrollRequest({"target": "0-0", "direction": "next"})
+    page.onscrollRequest({"target": "0-0", "direction": "next"})
+    assert page.childrens[0].offset == 100
+    assert page.getChanges()["rows"].count("<p") == 20
+
+    page.onscrollRequest({"target": "0-0", "direction": "previous"})
+    assert page.childrens[0].offset == 50
+
+
+class CachedNav(HTMLElement): 
+    cacheRender = True
+
+
+def test_htmlElement_renderCache(): 
+    from copy import deepcopy
+    from ..cache import RENDER_CACHE
+
+    RENDER_CACHE.clear()
+    template = Page(
+        path="/test", 
+        childrens=[
+            CachedNav(class_name="nav", childrens=[P(class_name="nav_text", text="nav")]), 
+            P(class_name="content", text="content"),
+        ],
+    )
+    first, second = deepcopy(template), deepcopy(template)
+    first.render()
+    assert RENDER_CACHE.stats()["misses"] == 1
+    # the copies of the page share the cached render
+    assert second.render() == first.render()
+    assert RENDER_CACHE.stats()["hits"] == 2
+
+    # a change in a descendant invalidates the cached render, only for this copy
+    second.childrens[0].childrens[0].text = "updated_nav"
+    assert "updated_nav" in second.render()
+    assert "updated_nav" not in first.render()
+
+    second.addElement(second.childrens[0], P(class_name="added", text="added"))
+    assert "added" in second.render()
+    assert RENDER_CACHE.stats()["misses"] == 3
+
+
+def test_htmlElement_renderCache_state(): 
+    from ..cache import RENDER_CACHE
+
+    RENDER_CACHE.clear()
+    page = Page(
+        path="/test", 
+        childrens=[HTMLElement(class_name="nav", cacheRender=True, childrens=[P(class_name="nav_text", text="nav")])],
+    )
+    page.updateElemId()
+    # the flag of the instances survives the state round trip
+    restored = HTMLElement.fromDict(page.dumpToDict())
+    assert restored.childrens[0].cacheRender
+
+    # but the restored elements are not cached, they get new versions on each request
+    restored.render()
+    assert RENDER_CACHE.stats()["entries"] == 0
+    page.render()
+    assert RENDER_CACHE.stats()["entries"] == 1
+
+
+def test_htmlElement_dumpToJSON(): 
+    import json
+
+    htmlElement = _buildNestedPage(width=3, depth=3)
+    htmlElement.updateElemId()
+    assert json.loads(htmlElement.dumpToJSON()) == json.loads(json.dumps(htmlElement.dumpToDict()))
+
+    elems = [htmlElement]
+    for elem in elems: 
+        elems.extend(elem.childrens)
+    cached = {elem.elemId: elem._stateCache[1] for elem in elems}
+    # each element only caches its own state, not the JSON of its subtree
+    assert sum(map(len, cached.values())) < len(htmlElement.dumpToJSON())
+
+    changed = htmlElement.findChildrenByElemId("0-1-2-0")
+    changed.text = "changed"
+    result = json.loads(htmlElement.dumpToJSON())
+    assert result == json.loads(json.dumps(htmlElement.dumpToDict()))
+    assert result["childrens"][1]["childrens"][2]["childrens"][0]["text"] == "changed"
+    # only the changed element is serialized again, its ancestors keep their own state
+    assert [elem.elemId for elem in elems if elem._stateCache[1] is not cached[elem.elemId]] == ["0-1-2-0"]
+
+
+def test_htmlElement_renderV2JSON_stateAfterRender(): 
+    import json
+    from ..htmlelement import Button
+
+    def onClick(document): 
+        ...
+
+    page = Page(path="/test", childrens=[Button(class_name="button", text="click", onClick=onClick)])
+    page.prepare()
+    page.dumpToJSON()
+
+    page.childrens[0].text = "changed"
+    result = json.loads(page.renderV2JSON())
+    # the state has the attributes that the render added to the changed elements
+    assert "onclick" in result["changes"]["button"]
+    assert result["state"]["childrens"][0]["attributes"]["onclick"] == "onClickListener('0-0')"
+
+    # the same for renderV2, with an element that gets its id (and its listener) when it's rendered
+    page.addElement(page, Button(class_name="added", text="added", onClick=onClick))
+    result = page.renderV2()
+    assert "onclick" in result["changes"]["pyfron_body"]
+    assert result["state"]["childrens"][1]["attributes"]["onclick"] in result["changes"]["pyfron_body"]
+
+
+def test_renderCache_threads(): 
+    from concurrent.futures import ThreadPoolExecutor
+    from ..cache import RenderCache
+
+    # a tiny cache, so the threads are evicting the keys of the others all the time
+    cache = RenderCache(maxBytes=50)
+
+    def render(i: int): 
+        for j in range(2000): 
+            key = (i + j) % 20
+            assert cache.getOrRender(key, lambda: f"fragment {key}") == f"fragment {key}"
+
+    with ThreadPoolExecutor(max_workers=8) as executor: 
+        list(executor.map(render, range(8)))
+
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 8 * 2000
+    assert stats["size"] == sum(len(f) for f in cache._fragments.values()) <= 50
+
+
+def test_htmlElement_inPlaceChanges(): 
+    import json
+    from copy import deepcopy
+    from ..htmlelement import Div, Input
+    from ..cache import RENDER_CACHE
+
+    page = Page(
+        path="/test", 
+        childrens=[
+            Input(class_name="input", value="initial"), 
+            CachedNav(class_name="nav", childrens=[P(class_name="nav_text", text="nav")]), 
+            Div(class_name="rows"), 
+        ],
+    )
+    page.prepare()
+    page.dumpToJSON()
+    page.render()
+    # copies don't count as changes, they keep sharing the cached state
+    copied = deepcopy(page)
+    assert not copied._changed and not copied._dirtyChildren
+    assert copied._version == page._version
+
+    inp, nav, rows = page.childrens
+    inp.attributes["value"] = "reset"
+    rows.childrens.append(P(class_name="row", text="new row"))
+    nav.childrens[0].attributes["title"] = "nav_title"
+
+    state = json.loads(page.dumpToJSON())
+    assert state == json.loads(json.dumps(page.dumpToDict()))
+    assert state["childrens"][0]["attributes"]["value"] == "reset"
+    assert state["childrens"][2]["childrens"][0]["text"] == "new row"
+    assert "nav_title" in page.render()
+
+    # the in place changes are sent to the client too
+    assert set(page.getChanges().keys()) == {"input", "nav_text", "rows"}
+    assert rows.childrens[0]._parent is rows
+
+
+def test_link_clientNavigation(): 
+    from ..htmlelement import Link
+
+    assert "pyfron_link" in Link(class_name="page", href="/other").attributes
+    assert "pyfron_link" in Link(class_name="root", href="/").attributes
+    for href in ("#section", "/static/file.pdf", "https://example.com", "//example.com/page"): 
+        assert "pyfron_link" not in Link(class_name="external", href=href).attributes
+
+    # the default can be overriden
+    assert "pyfron_link" not in Link(class_name="page", href="/other", clientNavigation=False).attributes
+    assert "pyfron_link" in Link(class_name="page", href="/download", clientNavigation=True).attributes
+
+    # the links keep their navigation mode when they are restored from the state
+    link = Link(class_name="page", href="/other", clientNavigation=False)
+    link.updateElemId()
+    assert "pyfron_link" not in HTMLElement.fromDict(link.dumpToDict()).attributes
+
+
+def test_htmlElement_deepcopy(): 
+    import json
+    from copy import deepcopy
+
+    page = _buildNestedPage(width=3, depth=3)
+    page.updateElemId()
+    page.dumpToJSON()
+    leaf = page.findChildrenByElemId("0-1-2-0")
+    leaf.text = "changed"
+
+    copied = deepcopy(page)
+    copiedLeaf = copied.findChildrenByElemId("0-1-2-0")
+    assert copiedLeaf is not leaf and copiedLeaf._parent is copied.childrens[1].childrens[2]
+    # the dirty markers point to the copied elements
+    assert copied._dirtyChildren == {copied.childrens[1]}
+    assert json.loads(copied.dumpToJSON()) == json.loads(page.dumpToJSON())
+    # the elements without dirty markers don't create the set
+    assert "_dirtyChildren" not in copied.childrens[0].__dict__
+    assert copied.childrens[0]._stateCache is page.childrens[0]._stateCache
+
+    # the copy tracks its own changes, without touching the original page
+    copied.childrens[0].attributes["title"] = "title"
+    copied.childrens[0].childrens.append(HTMLElement(class_name="added"))
+    assert copied.childrens[0].childrens[-1]._parent is copied.childrens[0]
+    assert set(copied.getChanges()) == {"elem_0", "elem_1_2_0"}
+    assert "title" not in page.childrens[0].attributes and len(page.childrens[0].childrens) == 3
+    assert set(page.getChanges()) == {"elem_1_2_0"}
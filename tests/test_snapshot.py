@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from ..base import Pyfron
+from ..benchmarks.helpers import DummyBackend
+from ..exceptions import InvalidSnapshot
+from ..htmlelement import P, Page
+from ..snapshot import buildSnapshot, loadSnapshot
+from .test_base import buildApp
+
+
+def test_snapshot_roundTrip(tmp_path): 
+    filename = str(tmp_path / "app.snapshot")
+    app = buildApp()
+    expected = app.onEvent("/test", {})
+    buildSnapshot(app, filename)
+
+    loaded = Pyfron.fromSnapshot(filename, DummyBackend)
+    # the pages are loaded when they are used for the first time
+    assert "/test" in loaded.pages and not loaded.pages._loaded
+    assert loaded.onEvent("/test", {}) == expected
+    assert not loaded.pages._loaded
+
+    # the events are handled with the page from the snapshot
+    state = loaded._getPage("/test").dumpToDict()
+    result = json.loads(loaded.onEvent("/test", {"state": state, "eventType": "click", "target": "0-0"}))
+    assert result["changes"]["rows"].count("<p") == 1
+
+
+def test_snapshot_replacePage(tmp_path): 
+    filename = str(tmp_path / "app.snapshot")
+    buildSnapshot(buildApp(), filename)
+
+    loaded = Pyfron.fromSnapshot(
+        filename, DummyBackend, pages=[Page(path="/test", childrens=[P(class_name="new", text="new page")])]
+    )
+    assert "new page" in loaded.onEvent("/test", {})
+
+
+@pytest.mark.parametrize("content", [b"", b"not a snapshot\n", b"no header end", b"[]\n"])
+def test_snapshot_invalid(tmp_path, content): 
+    filename = tmp_path / "app.snapshot"
+    filename.write_bytes(content)
+    with pytest.raises(InvalidSnapshot): 
+        Pyfron.fromSnapshot(str(filename), DummyBackend)
+
+
+def test_snapshot_truncated(tmp_path): 
+    filename = tmp_path / "app.snapshot"
+    buildSnapshot(buildApp(), str(filename))
+    filename.write_bytes(filename.read_bytes()[:-10])
+    with pytest.raises(InvalidSnapshot): 
+        loadSnapshot(str(filename))
+
+
+def test_snapshot_close(tmp_path): 
+    filename = str(tmp_path / "app.snapshot")
+    buildSnapshot(buildApp(), filename)
+    with loadSnapshot(filename) as snapshot: 
+        assert "add_row" in snapshot.renders["/test"]
+    assert snapshot._data.closed